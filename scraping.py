@@ -8,168 +8,365 @@ DATE        : Janvier 2026
 --------------------------------------------------------------------------------
 """
 
-import time
-import pandas as pd
+import asyncio
+import codecs
+import math
+import os
 import random
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
+import re
+from urllib.parse import urljoin
+
+import httpx
+import lxml.html
+from lxml import etree
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from playwright.async_api import async_playwright, Error as PlaywrightError
 
 # --- CONFIGURATION DU SCRAPING ---
 OBJECTIF = 1000  # Nombre d'offres à récupérer
 VILLE = ""  # Laisser vide pour une recherche "France Entière"
 NOM_FICHIER = "dataset_hellowork_v3_france.csv"
+# Fichier de travail : NOM_FICHIER n'est remplacé qu'en fin de collecte réussie,
+# et le .part reste disponible pour récupération en cas de plantage
+FICHIER_TEMPORAIRE = NOM_FICHIER + ".part"
+CARTES_PAR_PAGE = 20  # Nombre moyen d'offres par page de résultats
+NB_CONNEXIONS = 8  # Nombre de pages téléchargées simultanément (multiplexées en HTTP/2)
+PAUSE = (1.0, 2.2)  # Bornes (s) de la pause aléatoire anti-bot
+COLONNES = ("Titre", "Entreprise", "Localisation", "Contrat", "Salaire", "Lien")
 
+# Regex pour trouver une séquence de chiffres suivie du symbole € (compilée une seule fois)
+_SAL_RE = re.compile(r'([0-9\s]+€.*)')
 
-def lancer_scraping_france():
+# Requêtes XPath de l'extraction lxml (compilées une seule fois, au lieu de
+# retraduire un sélecteur CSS en XPath à chaque appel de cssselect)
+_CARD_XP = etree.XPath("//*[@data-cy='serpCard']")
+_H3_XP = etree.XPath("(.//h3)[1]")
+_PS_XP = etree.XPath(".//p")
+# Certaines versions de libxml2 ferment le <h3> à l'ouverture d'un <p> : les <p>
+# deviennent ses voisins et le <h3> reste vide (requête utilisée dans ce seul cas)
+_PS_VOISINS_XP = etree.XPath("following-sibling::p[position() <= 2]")
+_LOC_XP = etree.XPath("(.//*[@data-cy='localisationCard'])[1]")
+_CONTRAT_XP = etree.XPath("(.//*[@data-cy='contractCard'])[1]")
+_LIEN_XP = etree.XPath("(.//a)[1]/@href")
+
+# Sous-ressources inutiles à l'extraction, bloquées dans le navigateur de repli
+RESSOURCES_BLOQUEES = ("image", "font", "stylesheet", "media")
+
+# Construction de l'URL de recherche
+URL_BASE = f"https://www.hellowork.com/fr-fr/emploi/recherche.html?k={VILLE}"
+
+# User-Agent : Indispensable pour ne pas être détecté comme un robot basique
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Extraction côté navigateur : un seul appel eval_on_selector_all renvoie toutes les
+# cartes de la page sous forme de dictionnaires (au lieu de ~8 appels par carte).
+# Le texte de la carte n'est lu qu'une fois ; celui du h3 n'est renvoyé que s'il
+# sert au Plan B, pour alléger la réponse JSON.
+JS_EXTRACTION_CARTES = """
+cartes => {
+    const texte = (el) => el ? el.textContent.trim() : null;
+    return cartes.map(c => {
+        const h3 = c.querySelector('h3');
+        const ps = h3 ? h3.querySelectorAll('p') : [];
+        const lien = c.querySelector('a');
+        return {
+            titre: ps.length >= 2 ? texte(ps[0]) : null,
+            entreprise: ps.length >= 2 ? texte(ps[1]) : null,
+            h3: ps.length >= 2 ? null : texte(h3),
+            loc: texte(c.querySelector("[data-cy='localisationCard']")),
+            contrat: texte(c.querySelector("[data-cy='contractCard']")),
+            text: c.textContent,
+            lien: lien ? lien.href : null
+        };
+    });
+}
+"""
+
+
+def construire_offre(ligne, deja_vues):
     """
-    Fonction principale du robot d'extraction.
-    Parcourt les pages de résultats, extrait les données brutes et sauvegarde en CSV.
+    Transforme une carte brute (dictionnaire issu du JS ou de lxml) en ligne du dataset,
+    sous forme de tuple dans l'ordre de COLONNES.
+    Retourne None si la carte est inexploitable (titre vide) ou déjà collectée :
+    deja_vues contient l'empreinte (Titre, Entreprise, Localisation) des offres retenues.
     """
-    print(f"--- 🇫🇷 Démarrage du scraping FRANCE ENTIÈRE : Objectif {OBJECTIF} offres ---")
+    # A. Titre & Entreprise
+    # On utilise une logique robuste : parfois c'est h3, parfois des p
+    if ligne["titre"] is not None and ligne["entreprise"] is not None:
+        titre = ligne["titre"]
+        entreprise = ligne["entreprise"]
+    else:
+        # Fallback (Plan B) si la structure HTML change
+        parts = (ligne["h3"] or "").split('\n')
+        titre = parts[0].strip()
+        entreprise = parts[1].strip() if len(parts) > 1 else "Inconnu"
 
-    # 1. Configuration du navigateur (Chrome)
-    options = webdriver.ChromeOptions()
-    # options.add_argument("--headless")  # Mode sans interface graphique (activé en prod)
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
+    if not titre: return None
 
-    # User-Agent : Indispensable pour ne pas être détecté comme un robot basique
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
+    # B. Localisation
+    loc = ligne["loc"] if ligne["loc"] is not None else "France"
+
+    # Dédoublonnage à la volée : HelloWork répète des cartes d'une page à l'autre,
+    # on s'arrête avant d'analyser le contrat, le salaire et le lien
+    # (les cartes écartées sont compensées par des pages supplémentaires, cf. scraper_pages)
+    cle = hash((titre, entreprise, loc))
+    if cle in deja_vues: return None
+    deja_vues.add(cle)
+
+    # C. Contrat
+    contrat = ligne["contrat"] if ligne["contrat"] is not None else "Non spécifié"
+
+    # D. Extraction Salaire (Parsing du texte global)
+    salaire = "Non affiché"
+    carte_text = ligne["text"] or ""
+    if "€" in carte_text:
+        match = _SAL_RE.search(carte_text)
+        if match:
+            salaire = match.group(1).strip()
+        else:
+            # Méthode ligne par ligne si la regex échoue
+            for line in carte_text.split('\n'):
+                if "€" in line:
+                    salaire = line.strip()
+                    break
+
+    # E. Lien
+    lien = ligne["lien"] or "Non disponible"
+
+    return titre, entreprise, loc, contrat, salaire, lien
 
-    # 2. Initialisation du Driver Selenium
-    # Gestion automatique de la version du ChromeDriver
+
+def extraire_cartes_html(html, url):
+    """
+    Équivalent Python (lxml) de JS_EXTRACTION_CARTES pour une page HTML statique.
+    """
+    def texte(elements):
+        return elements[0].text_content().strip() if elements else None
+
+    doc = lxml.html.fromstring(html)
+
+    lignes = []
+    for c in _CARD_XP(doc):
+        h3 = _H3_XP(c)
+        ps = _PS_XP(h3[0]) if h3 else []
+        if h3 and not ps and not h3[0].text_content().strip():
+            ps = _PS_VOISINS_XP(h3[0])
+        lien = _LIEN_XP(c)
+        lignes.append({
+            "titre": texte(ps[0:1]) if len(ps) >= 2 else None,
+            "entreprise": texte(ps[1:2]) if len(ps) >= 2 else None,
+            "h3": None if len(ps) >= 2 else texte(h3),
+            "loc": texte(_LOC_XP(c)),
+            "contrat": texte(_CONTRAT_XP(c)),
+            "text": c.text_content(),
+            # Lien absolu, comme a.href côté navigateur
+            "lien": urljoin(url, lien[0]) if lien else None
+        })
+    return lignes
+
+
+async def recuperer_page(client, semaphore, page):
+    """
+    Chemin rapide : télécharge une page de résultats via httpx (HTTP/2) et la parse avec lxml.
+    Retourne None si la page est bloquée (challenge anti-bot) ou rendue en JavaScript,
+    auquel cas elle sera récupérée via le navigateur de repli (Playwright).
+    """
+    url = f"{URL_BASE}&p={page}"
+    async with semaphore:
+        # PAUSE ALÉATOIRE : Crucial pour éviter le blocage IP (Anti-bot)
+        # Les premières pages décalent chacune une connexion (une pause par connexion)
+        if page <= NB_CONNEXIONS:
+            await asyncio.sleep(random.uniform(*PAUSE))
+        try:
+            r = await client.get(url)
+        except httpx.HTTPError:
+            return None
+
+    if r.status_code != 200:
+        return None
+
+    # Corps vide (ou sans élément) : lxml lève "Document is empty",
+    # la page part alors au repli comme une page bloquée
     try:
-        driver = webdriver.Chrome(options=options)
-    except Exception as e:
-        print("⚠️ Erreur lancement driver standard, tentative avec Service...")
-        driver = webdriver.Chrome(service=Service(), options=options)
+        return extraire_cartes_html(r.text, str(r.url)) or None
+    except etree.ParserError:
+        return None
 
-    # Construction de l'URL de recherche
-    url_base = f"https://www.hellowork.com/fr-fr/emploi/recherche.html?k={VILLE}"
-    driver.get(url_base)
 
-    donnees = []
-    page = 1
+async def bloquer_ressources(route):
+    """
+    Interception réseau Playwright : abandonne images, polices, CSS et médias.
+    """
+    if route.request.resource_type in RESSOURCES_BLOQUEES:
+        await route.abort()
+    else:
+        await route.continue_()
+
 
+async def ouvrir_navigateur():
+    """
+    Lance Chromium via Playwright (utilisé uniquement en repli).
+    Retourne (playwright, navigateur, onglet) ; l'onglet est réutilisé pour toutes les pages.
+    """
+    pw = await async_playwright().start()
     try:
-        # Pause pour laisser le temps au JavaScript de charger
-        time.sleep(2)
+        navigateur = await pw.chromium.launch(headless=False)  # headless=True : sans interface graphique (activé en prod)
+
+        # Contexte unique : cookies et connexions TLS/HTTP2 conservés d'une page à l'autre
+        contexte = await navigateur.new_context(user_agent=USER_AGENT, viewport={"width": 1920, "height": 1080})
+        await contexte.route("**/*", bloquer_ressources)
+        onglet = await contexte.new_page()
+
+        await onglet.goto(URL_BASE, wait_until="domcontentloaded")
+    except BaseException:
+        # L'appelant ne reçoit rien à fermer : on arrête ici le driver Playwright
+        # (ce qui ferme aussi Chromium s'il a été lancé)
+        await pw.stop()
+        raise
+
+    # Gestion de la bannière Cookies (si elle apparaît)
+    try:
+        await onglet.click("#onetrust-accept-btn-handler", timeout=2000)
+    except PlaywrightError:
+        pass  # On ignore si le bouton n'est pas là
+
+    return pw, navigateur, onglet
+
+
+async def recuperer_page_navigateur(onglet, page):
+    """
+    Chemin de repli : charge la page dans Chromium et extrait les cartes en un seul appel JS.
+    """
+    await onglet.goto(f"{URL_BASE}&p={page}", wait_until="domcontentloaded")
+    # Pause aléatoire anti-bot, qui laisse aussi le temps au JavaScript de charger
+    await asyncio.sleep(random.uniform(*PAUSE))
+    return await onglet.eval_on_selector_all("[data-cy='serpCard']", JS_EXTRACTION_CARTES)
 
-        # Gestion de la bannière Cookies (si elle apparaît)
-        try:
-            driver.find_element(By.ID, "onetrust-accept-btn-handler").click()
-        except:
-            pass  # On ignore si le bouton n'est pas là
 
-        # --- BOUCLE PRINCIPALE ---
-        while len(donnees) < OBJECTIF:
-            print(f"📄 Page {page} | Stock : {len(donnees)} offres collectées")
+def ecrire_lot(f, colonnes, entete):
+    """
+    Ajoute un lot d'offres (dictionnaire colonne -> liste de valeurs) au CSV ouvert
+    (sérialisation C++ par PyArrow) et le flushe sur disque, pour qu'un plantage
+    en cours de route ne fasse rien perdre.
+    """
+    # Format PyArrow : texte et en-tête entre guillemets (cf. README)
+    pacsv.write_csv(
+        pa.Table.from_pydict(colonnes), f,
+        write_options=pacsv.WriteOptions(include_header=entete, delimiter=';', quoting_style='needed')
+    )
+    f.flush()
 
-            # Récupération de toutes les "cartes" offres de la page courante
-            cartes = driver.find_elements(By.CSS_SELECTOR, "[data-cy='serpCard']")
 
-            if not cartes:
-                print("⚠️ Plus d'offres trouvées ou blocage de sécurité.")
-                break
+async def scraper_pages():
+    """
+    Parcourt les pages de résultats, extrait les données brutes et les ajoute au CSV
+    temporaire page par page (mémoire constante quel que soit l'OBJECTIF).
+    Retourne le nombre d'offres écrites.
+    """
+    nb_offres = 0
+    deja_vues = set()  # Empreintes des offres déjà collectées
+    pw = navigateur = onglet = None  # Chromium n'est lancé que si une page est bloquée
+    entete = True  # L'en-tête CSV n'est écrit qu'avec le premier lot
+
+    try:
+        # Encodage utf-8-sig (BOM) pour compatibilité Excel parfaite
+        # Un seul client : connexion TCP+TLS réutilisée, requêtes multiplexées en HTTP/2
+        # (redirections suivies comme le faisait requests, sinon chaque 301/302 partirait au repli)
+        async with httpx.AsyncClient(http2=True, follow_redirects=True, headers={"User-Agent": USER_AGENT}, timeout=10) as client:
+            with open(FICHIER_TEMPORAIRE, 'wb') as f:
+                f.write(codecs.BOM_UTF8)
+
+                # 1. Téléchargement concurrent des pages (chemin rapide httpx + lxml)
+                semaphore = asyncio.Semaphore(NB_CONNEXIONS)
+                taches = []  # Tâche de téléchargement de la page n à l'indice n - 1
+                page = 0
 
-            for carte in cartes:
                 try:
-                    # A. Extraction Titre & Entreprise
-                    # On utilise une logique robuste : parfois c'est h3, parfois des p
-                    h3 = carte.find_element(By.TAG_NAME, "h3")
-                    ps = h3.find_elements(By.TAG_NAME, "p")
-
-                    if len(ps) >= 2:
-                        titre = ps[0].get_attribute("textContent").strip()
-                        entreprise = ps[1].get_attribute("textContent").strip()
-                    else:
-                        # Fallback (Plan B) si la structure HTML change
-                        full_text = h3.get_attribute("textContent").strip()
-                        parts = full_text.split('\n')
-                        titre = parts[0].strip()
-                        entreprise = parts[1].strip() if len(parts) > 1 else "Inconnu"
-
-                    if not titre: continue
-
-                    # B. Extraction Localisation
-                    try:
-                        loc = carte.find_element(By.CSS_SELECTOR, "[data-cy='localisationCard']").get_attribute(
-                            "textContent").strip()
-                    except:
-                        loc = "France"
-
-                    # C. Extraction Contrat
-                    try:
-                        contrat = carte.find_element(By.CSS_SELECTOR, "[data-cy='contractCard']").get_attribute(
-                            "textContent").strip()
-                    except:
-                        contrat = "Non spécifié"
-
-                    # D. Extraction Salaire (Parsing du texte global)
-                    salaire = "Non affiché"
-                    carte_text = carte.get_attribute("textContent")
-                    if "€" in carte_text:
-                        import re
-                        # Regex pour trouver une séquence de chiffres suivie du symbole €
-                        match = re.search(r'([0-9\s]+€.*)', carte_text)
-                        if match:
-                            salaire = match.group(1).strip()
-                        else:
-                            # Méthode ligne par ligne si la regex échoue
-                            for line in carte_text.split('\n'):
-                                if "€" in line:
-                                    salaire = line.strip()
-                                    break
-
-                    # E. Extraction Lien
-                    try:
-                        lien = carte.find_element(By.TAG_NAME, "a").get_attribute("href")
-                    except:
-                        lien = "Non disponible"
-
-                    # Ajout au dataset
-                    donnees.append({
-                        "Titre": titre,
-                        "Entreprise": entreprise,
-                        "Localisation": loc,
-                        "Contrat": contrat,
-                        "Salaire": salaire,
-                        "Lien": lien
-                    })
-
-                    # Arrêt immédiat si l'objectif est atteint
-                    if len(donnees) >= OBJECTIF: break
-
-                except Exception as e:
-                    continue  # Si une carte bugue, on passe à la suivante
-
-            # Passage à la page suivante
-            page += 1
-            driver.get(f"{url_base}&p={page}")
-
-            # PAUSE ALÉATOIRE : Crucial pour éviter le blocage IP (Anti-bot)
-            time.sleep(random.uniform(1.0, 2.2))
+                    # --- BOUCLE PRINCIPALE ---
+                    # Les pages sont traitées dans l'ordre, au fur et à mesure qu'elles arrivent
+                    while nb_offres < OBJECTIF:
+                        page += 1
+
+                        # Fenêtre glissante : on lance les pages encore nécessaires pour l'objectif,
+                        # au plus NB_CONNEXIONS d'avance (les cartes écartées sont compensées ici)
+                        reste = OBJECTIF - nb_offres
+                        fin = page - 1 + min(NB_CONNEXIONS, math.ceil(reste / CARTES_PAR_PAGE))
+                        while len(taches) < fin:
+                            taches.append(asyncio.create_task(recuperer_page(client, semaphore, len(taches) + 1)))
+
+                        lignes = await taches[page - 1]
+
+                        # 2. Repli navigateur (Playwright) pour les pages bloquées
+                        if lignes is None:
+                            print(f"🔒 Page {page} bloquée, repli sur le navigateur...")
+                            if onglet is None:
+                                pw, navigateur, onglet = await ouvrir_navigateur()
+                            lignes = await recuperer_page_navigateur(onglet, page)
+
+                        if not lignes:
+                            print("⚠️ Plus d'offres trouvées ou blocage de sécurité.")
+                            break
+
+                        # Stockage par colonne : une liste par champ plutôt qu'un dict par offre
+                        colonnes = {nom: [] for nom in COLONNES}
+                        for ligne in lignes:
+                            try:
+                                offre = construire_offre(ligne, deja_vues)
+                                if offre:
+                                    for valeurs, valeur in zip(colonnes.values(), offre):
+                                        valeurs.append(valeur)
+                            except Exception as e:
+                                continue  # Si une carte bugue, on passe à la suivante
+
+                        # 3. Exportation immédiate du lot (sans dépasser l'objectif)
+                        reste = OBJECTIF - nb_offres
+                        colonnes = {nom: valeurs[:reste] for nom, valeurs in colonnes.items()}
+                        nb_lot = len(colonnes["Titre"])
+                        if nb_lot:
+                            ecrire_lot(f, colonnes, entete)
+                            entete = False
+                            nb_offres += nb_lot
+
+                        print(f"📄 Page {page} | Stock : {nb_offres} offres collectées")
+                finally:
+                    # Annulation des pages encore en vol avant la fermeture du client,
+                    # y compris si le repli navigateur a levé une exception
+                    for tache in taches:
+                        tache.cancel()
+                    await asyncio.gather(*taches, return_exceptions=True)
 
     finally:
         # Fermeture propre du navigateur dans tous les cas
         try:
-            driver.quit()
+            if navigateur is not None:
+                await navigateur.close()
+            if pw is not None:
+                await pw.stop()
         except:
             pass
 
-    # 3. Exportation des données
-    if donnees:
-        df = pd.DataFrame(donnees)
-        # Encodage utf-8-sig pour compatibilité Excel parfaite
-        df.to_csv(NOM_FICHIER, index=False, encoding='utf-8-sig', sep=';')
-        print(f"\n✨ SUCCÈS ! Fichier '{NOM_FICHIER}' généré avec {len(df)} lignes.")
+    return nb_offres
+
+
+def lancer_scraping_france():
+    """
+    Fonction principale du robot d'extraction.
+    Lance la boucle asynchrone de collecte puis affiche le bilan.
+    """
+    print(f"--- 🇫🇷 Démarrage du scraping FRANCE ENTIÈRE : Objectif {OBJECTIF} offres ---")
+
+    nb_offres = asyncio.run(scraper_pages())
+
+    if nb_offres:
+        # Remplacement atomique : l'ancien dataset reste intact jusqu'ici
+        os.replace(FICHIER_TEMPORAIRE, NOM_FICHIER)
+        print(f"\n✨ SUCCÈS ! Fichier '{NOM_FICHIER}' généré avec {nb_offres} lignes.")
     else:
+        # Le dataset précédent est conservé, seul le fichier de travail est supprimé
+        os.remove(FICHIER_TEMPORAIRE)
         print("❌ ÉCHEC : Aucune donnée récupérée.")
 
 
 if __name__ == "__main__":
-    lancer_scraping_france()
\ No newline at end of file
+    lancer_scraping_france()
@@ -9,114 +9,203 @@ DATE        : Janvier 2026
 --------------------------------------------------------------------------------
 """
 
+import codecs
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import re
 import os
 
+try:
+    from numba import njit  # Optionnel : compilation JIT du noyau salaire
+except ImportError:
+    njit = None
+
 # --- CONFIGURATION ---
 DOSSIER = r"C:\Users\uberthon\Downloads\scap"
 FICHIER_ENTREE = os.path.join(DOSSIER, "dataset_hellowork_v3_france.csv")
-FICHIER_SORTIE = os.path.join(DOSSIER, "dataset_clean_final.csv")
-
-
-def nettoyer_salaire(texte_salaire):
+FICHIER_SORTIE = os.path.join(DOSSIER, "dataset_clean_final.parquet")
+FICHIER_SORTIE_CSV = os.path.join(DOSSIER, "dataset_clean_final.csv")
+EXPORT_CSV = True  # Copie CSV secondaire (Excel, anciens rapports Power BI)
+TAMPON_ECRITURE = 1 << 20  # Taille du tampon d'écriture CSV (1 Mo)
+
+# --- EXPRESSIONS RÉGULIÈRES (compilées une seule fois à l'import) ---
+# Salaires : espaces (y compris insécables) et valeurs numériques
+_SAL_ESPACES = re.compile('[ \u202f\xa0]')
+_SAL_NUM = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Titres : mentions horaires (ex: 35h, 39H)
+_HORAIRE = re.compile(r'\d+(?:[\.,]\d+)?\s?[hH]')
+# Titres : mots-clés parasites réunis en une seule alternative
+_NOISE = re.compile(
+    r"temps\s?plein|temps\s?partiel"
+    r"|\bCDI\b|\bCDD\b|\bIntérim\b|\bStage\b|\bAlternance\b"
+    r"|\bH/F\b|\bF/H\b|\(.*?\)"  # Tout ce qui est entre parenthèses
+    r"|\s-\s|\|",  # Tirets et barres isolés
+    re.IGNORECASE
+)
+_DASH = re.compile(r'[-_]')
+_WS = re.compile(r'\s+')
+
+# Localisation : arrondissements (ex: "Paris 15e")
+_ARRDT = re.compile(r'\s\d+(?:er|e|ème)?$')
+
+
+def nettoyer_salaire(serie_salaire):
     """
-    Convertit une chaîne de caractères hétérogène en un flottant (Salaire Annuel Brut).
+    Convertit une colonne de chaînes hétérogènes en flottants (Salaire Annuel Brut).
+    Traitement vectorisé : toute la colonne est traitée en une passe pandas/NumPy.
 
     Args:
-        texte_salaire (str): Ex: "2000 € / mois", "35k €", "12 € / heure"
+        serie_salaire (pd.Series): Ex: "2000 € / mois", "35k €", "12 € / heure"
 
     Returns:
-        float: Le salaire ramené à l'année (ex: 24000.0) ou None si invalide.
+        pd.Series: Le salaire ramené à l'année (ex: 24000.0) ou NaN si invalide.
     """
+    s = serie_salaire.astype('string').str.lower()
+
     # 1. Gestion des valeurs nulles ou masquées
-    if not isinstance(texte_salaire, str) or "non affiché" in texte_salaire.lower():
-        return None
+    # Ces lignes (souvent la moitié du fichier) sont écartées avant tout traitement
+    s = s[~s.str.contains("non affiché", regex=False, na=True)]
 
     # 2. Nettoyage préliminaire (suppression espaces, symboles invisibles, conversion k->000)
-    clean_txt = texte_salaire.lower().replace(" ", "").replace("\u202f", "").replace("\xa0", "").replace("k", "000")
+    s = s.str.replace(_SAL_ESPACES, '', regex=True).str.replace('k', '000', regex=False)
 
     # 3. Extraction des valeurs numériques via Regex
-    nombres = re.findall(r'(\d+(?:\.\d+)?)', clean_txt)
-    if not nombres: return None
-
     # Si une fourchette est donnée (ex: 30000-40000), on prend la moyenne
-    valeur = sum([float(n) for n in nombres]) / len(nombres)
+    valeur = (
+        s.str.extractall(_SAL_NUM)[0].astype(float)
+        .groupby(level=0).mean()
+        .reindex(s.index)
+    )
+
+    # 4. & 5. Standardisation temporelle et filtrage (noyau NumPy / Numba)
+    salaire_annuel = _annualiser(
+        valeur.to_numpy(dtype=float),
+        s.str.contains("mois", regex=False, na=False).to_numpy(dtype=bool),
+        s.str.contains("heure", regex=False, na=False).to_numpy(dtype=bool),
+        s.str.contains("jour", regex=False, na=False).to_numpy(dtype=bool),
+    )
+
+    # Les lignes écartées à l'étape 1 reviennent en NaN
+    return pd.Series(salaire_annuel, index=s.index).round(2).reindex(serie_salaire.index)
 
+
+def _annualiser_numpy(valeur, has_mois, has_heure, has_jour):
+    """
+    Ramène les valeurs à l'année puis écarte les aberrations (version NumPy).
+    np.select retient la première condition vraie, comme une cascade if/elif.
+    """
     # 4. Logique de standardisation temporelle (Tout -> Annuel)
-    multiplicateur = 1.0
-
-    if "mois" in clean_txt:
-        multiplicateur = 12.0
-    elif "heure" in clean_txt:
-        multiplicateur = 151.67 * 12  # Base 35h (151.67h/mois) sur 12 mois
-    elif "jour" in clean_txt:
-        multiplicateur = 218.0  # Convention forfait jour cadre moyen
-    elif 1200 <= valeur <= 12000:
-        # Heuristique : Si aucune unité n'est précisée mais que le chiffre est
-        # entre 1200 et 12000, il s'agit statistiquement d'un salaire mensuel.
-        multiplicateur = 12.0
+    multiplicateur = np.select(
+        [
+            has_mois,
+            has_heure,
+            has_jour,
+            # Heuristique : Si aucune unité n'est précisée mais que le chiffre est
+            # entre 1200 et 12000, il s'agit statistiquement d'un salaire mensuel.
+            (valeur >= 1200) & (valeur <= 12000),
+        ],
+        [
+            12.0,
+            151.67 * 12,  # Base 35h (151.67h/mois) sur 12 mois
+            218.0,  # Convention forfait jour cadre moyen
+            12.0,
+        ],
+        default=1.0,
+    )
 
     salaire_annuel = valeur * multiplicateur
 
     # 5. Filtrage des valeurs aberrantes (Erreurs de saisie)
     # On exclut les salaires impossibles (< 14k ou > 200k pour ce scope)
-    if salaire_annuel < 14000 or salaire_annuel > 200000:
-        return None
-
-    return round(salaire_annuel, 2)
+    return np.where((salaire_annuel >= 14000) & (salaire_annuel <= 200000), salaire_annuel, np.nan)
 
 
-def simplifier_titre(titre_brut):
+def _annualiser_boucle(valeur, has_mois, has_heure, has_jour):
     """
-    Nettoie le titre de l'offre pour le rendre lisible dans les graphiques.
-    Supprime le 'bruit' (H/F, contrat, horaires).
+    Même logique que _annualiser_numpy, écrite en boucle scalaire pour Numba
+    (Numba ne gère pas le module re : les regex restent côté pandas).
     """
-    if not isinstance(titre_brut, str): return "Inconnu"
-
-    titre_clean = titre_brut
-
-    # Suppression des mentions horaires (ex: 35h, 39H)
-    titre_clean = re.sub(r'\d+(?:[\.,]\d+)?\s?[hH]', "", titre_clean)
-
-    # Liste des mots-clés parasites à supprimer
-    mots_a_supprimer = [
-        r"temps\s?plein", r"temps\s?partiel",
-        r"\bCDI\b", r"\bCDD\b", r"\bIntérim\b", r"\bStage\b", r"\bAlternance\b",
-        r"\bH/F\b", r"\bF/H\b", r"\(.*?\)",  # Tout ce qui est entre parenthèses
-        r"\s-\s", r"\|"  # Tirets et barres isolés
-    ]
-
-    for motif in mots_a_supprimer:
-        titre_clean = re.sub(motif, " ", titre_clean, flags=re.IGNORECASE)
-
-    # Suppression des espaces multiples et mise en forme
-    return re.sub(r"\s+", " ", re.sub(r"[-_]", " ", titre_clean)).strip().capitalize()
-
-
-def separer_localisation(loc_brute):
+    sortie = np.empty_like(valeur)
+    for i in range(valeur.size):
+        v = valeur[i]
+        if has_mois[i]:
+            m = 12.0
+        elif has_heure[i]:
+            m = 151.67 * 12
+        elif has_jour[i]:
+            m = 218.0
+        elif 1200 <= v <= 12000:
+            m = 12.0
+        else:
+            m = 1.0
+        a = v * m
+        sortie[i] = a if 14000 <= a <= 200000 else np.nan
+    return sortie
+
+
+# Noyau compilé (mis en cache sur disque) si Numba est installé, NumPy sinon
+_annualiser = njit(cache=True)(_annualiser_boucle) if njit is not None else _annualiser_numpy
+
+
+def simplifier_titre(serie_titre):
     """
-    Sépare la chaîne de localisation brute en (Ville, Département).
+    Nettoie les titres des offres pour les rendre lisibles dans les graphiques.
+    Supprime le 'bruit' (H/F, contrat, horaires), de façon vectorisée sur toute la colonne.
+    """
+    return (
+        serie_titre.astype('string')
+        # Suppression des mentions horaires (ex: 35h, 39H)
+        .str.replace(_HORAIRE, "", regex=True)
+        # Suppression des mots-clés parasites (une seule passe sur l'alternative)
+        # Motif compilé : pandas garde le module re, dont \s et \b gèrent l'Unicode
+        # (espaces insécables, lettres accentuées), contrairement à RE2
+        .str.replace(_NOISE, " ", regex=True)
+        # Suppression des espaces multiples et mise en forme
+        .str.replace(_DASH, " ", regex=True)
+        .str.replace(_WS, " ", regex=True)
+        .str.strip()
+        .str.capitalize()
+        .fillna("Inconnu")
+    )
+
+
+def separer_localisation(serie_loc):
+    """
+    Sépare la colonne de localisation brute en (Ville, Département), de façon vectorisée.
     Exemple : 'Paris 15e - 75' -> Ville='Paris', Dept='75'
+
+    Returns:
+        pd.DataFrame: Colonnes 'Ville' et 'Departement', même index que l'entrée.
     """
-    if not isinstance(loc_brute, str):
-        return pd.Series(["Inconnu", "Inconnu"])
+    loc = serie_loc.astype('string')
 
-    # Séparation sur le dernier tiret trouvé
-    parts = loc_brute.rsplit(' - ', 1)
+    # Séparation sur le dernier tiret trouvé (reindex : colonne 1 absente si aucun tiret)
+    parts = loc.str.rsplit(' - ', n=1, expand=True).reindex(columns=[0, 1]).astype('string')
+    a_tiret = parts[1].notna()
 
-    if len(parts) == 2:
-        ville = parts[0].strip()
-        dept = parts[1].strip()
-    else:
-        ville = loc_brute.strip()
-        dept = "France"
+    ville = parts[0].where(a_tiret, loc).str.strip()
+    dept = parts[1].str.strip().where(a_tiret, "France")
 
     # Nettoyage spécifique des arrondissements pour regrouper les grandes villes
     # Ex: "Paris 15e" devient "Paris"
-    ville = re.sub(r'\s\d+(?:er|e|ème)?$', '', ville)
+    ville = ville.str.replace(_ARRDT, '', regex=True)
+
+    return pd.DataFrame({
+        'Ville': ville.fillna("Inconnu"),
+        'Departement': dept.mask(loc.isna(), "Inconnu"),
+    })
 
-    return pd.Series([ville, dept])
+
+def en_categories(df, colonnes):
+    """
+    Convertit les colonnes textuelles très répétitives en 'category' : le dédoublonnage
+    compare alors des codes entiers, et Parquet les stocke en colonnes dictionnaire.
+    Les colonnes absentes du DataFrame sont ignorées.
+    """
+    return df.astype({c: 'category' for c in colonnes if c in df.columns})
 
 
 def lancer_traitement_final():
@@ -131,38 +220,61 @@ def lancer_traitement_final():
         return
 
     # 1. Chargement (Gestion robuste des séparateurs CSV)
+    # Moteur C + colonnes typées 'string' : pas d'inférence de types ligne à ligne
+    options_lecture = dict(on_bad_lines='skip', engine='c', dtype='string', encoding='utf-8-sig')
     try:
-        df = pd.read_csv(FICHIER_ENTREE, sep=';', on_bad_lines='skip', engine='python')
-    except:
-        df = pd.read_csv(FICHIER_ENTREE, sep=',', on_bad_lines='skip', engine='python')
+        df = pd.read_csv(FICHIER_ENTREE, sep=';', **options_lecture)
+    except pd.errors.ParserError:
+        df = None
+
+    # Une seule colonne lue => le fichier n'est pas séparé par des ';'
+    if df is None or df.shape[1] == 1:
+        df = pd.read_csv(FICHIER_ENTREE, sep=',', **options_lecture)
     print(f"✅ Chargement réussi : {len(df)} lignes brutes importées.")
 
-    # 2. Application des transformations
+    # 2. Application des transformations (fonctions vectorisées, sans toucher à df)
     print("... Normalisation des salaires (Mensuel/Horaire -> Annuel)")
-    df['Salaire_Annuel'] = df['Salaire'].apply(nettoyer_salaire)
+    salaire_annuel = nettoyer_salaire(df['Salaire'])
 
     print("... Nettoyage sémantique des titres")
-    df['Titre_Simplifie'] = df['Titre'].apply(simplifier_titre)
+    titre_simplifie = simplifier_titre(df['Titre'])
 
     print("... Structuration géographique (Ville / Département)")
-    df[['Ville', 'Departement']] = df['Localisation'].apply(separer_localisation)
+    geo = separer_localisation(df['Localisation'])
 
     # 3. Sélection des features (colonnes) pertinentes pour Power BI
     cols = ['Titre_Simplifie', 'Entreprise', 'Ville', 'Departement', 'Contrat', 'Salaire_Annuel']
 
-    # Vérification de l'existence des colonnes
-    cols_existantes = [c for c in cols if c in df.columns]
-    df_clean = df[cols_existantes].copy()
-
-    # 4. Dédoublonnage
-    # On supprime les offres identiques (même titre, même boite, même ville)
-    df_clean.drop_duplicates(subset=['Titre_Simplifie', 'Entreprise', 'Ville'], inplace=True)
+    # Chaîne unique assign -> filter -> pipe -> drop_duplicates : pas de copie intermédiaire
+    df_clean = (
+        df.assign(Salaire_Annuel=salaire_annuel, Titre_Simplifie=titre_simplifie, **geo)
+        # Vérification de l'existence des colonnes (filter ignore les absentes)
+        .filter(items=cols)
+        # 4. Dédoublonnage
+        .pipe(en_categories, ['Titre_Simplifie', 'Entreprise', 'Ville', 'Departement', 'Contrat'])
+        # On supprime les offres identiques (même titre, même boite, même ville)
+        .drop_duplicates(subset=['Titre_Simplifie', 'Entreprise', 'Ville'])
+    )
 
     # 5. Exportation
-    df_clean.to_csv(FICHIER_SORTIE, index=False, encoding='utf-8-sig', sep=',')
+    # Parquet (colonnaire, compressé zstd) : format principal, lu nativement par Power BI
+    df_clean.to_parquet(FICHIER_SORTIE, engine='pyarrow', compression='zstd', index=False)
+
+    # CSV secondaire (PyArrow : sérialisation CSV en C++, BOM utf-8 pour Excel)
+    # Tampon d'écriture de 1 Mo : moins d'appels système write() sur les gros fichiers
+    if EXPORT_CSV:
+        with open(FICHIER_SORTIE_CSV, 'wb', buffering=TAMPON_ECRITURE) as f:
+            f.write(codecs.BOM_UTF8)
+            # Format PyArrow : texte et en-tête entre guillemets, 42000.0 écrit 42000 (cf. README)
+            pacsv.write_csv(
+                pa.Table.from_pandas(df_clean, preserve_index=False), f,
+                write_options=pacsv.WriteOptions(delimiter=',', quoting_style='needed')
+            )
 
     print("\n--- 🎉 TRAITEMENT TERMINÉ ---")
     print(f"Fichier final généré : {FICHIER_SORTIE}")
+    if EXPORT_CSV:
+        print(f"Copie CSV : {FICHIER_SORTIE_CSV}")
     print(f"Statistiques :")
     print(f" - Offres uniques : {len(df_clean)}")
     print(f" - Salaires exploitables : {df_clean['Salaire_Annuel'].notna().sum()}")